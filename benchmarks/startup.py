@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cold start benchmark of tor_upload.py.
+Runs 'tor_upload.py --help' in fresh interpreters and checks that
+parsing the command line doesn't import the networking modules.
+Urls of the registry (they are hard-coded to show the help w/o imports)
+are compared with the urls of the modules.
+Exit code 1 if the median time exceeds --max-ms, a heavy module
+is imported or an url drifted, so it can be run in CI to catch
+regressions.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('aiohttp', 'aiohttp_socks', 'aiofiles',
+                 'sitemodules.dlfree', 'sitemodules.anonfamily')
+CHECK_IMPORTS = """
+import sys
+sys.argv = ['tor_upload.py', 'dlfree', '.']
+import tor_upload
+tor_upload.arg_parser()
+print(' '.join(m for m in {!r} if m in sys.modules))
+""".format(HEAVY_MODULES)
+CHECK_URLS = """
+import sys
+from sitemodules import registry
+try:
+    for site, (_, _, url) in sorted(registry.BUILTIN_MODULES.items()):
+        module_url = registry.load(site)().url
+        if module_url != url:
+            print('{}: {} in the registry, {} in the module'.format(
+                site, url, module_url))
+except ImportError as e:
+    print(e)
+    sys.exit(2)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--runs', type=int, default=20)
+    parser.add_argument('--max-ms', type=float, default=300)
+    args = parser.parse_args()
+
+    script = os.path.join(ROOT, 'tor_upload.py')
+    times = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script, '--help'], cwd=ROOT,
+                       stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(times)
+    print('--help: median {:.1f} ms, min {:.1f} ms, max {:.1f} ms '
+          '({} runs)'.format(median, min(times), max(times), args.runs))
+
+    imported = subprocess.run(
+        [sys.executable, '-c', CHECK_IMPORTS], cwd=ROOT, check=True,
+        stdout=subprocess.PIPE, universal_newlines=True).stdout.split()
+    failed = False
+    if imported:
+        print('Imported while parsing arguments: {}'.format(
+            ', '.join(imported)))
+        failed = True
+    urls = subprocess.run(
+        [sys.executable, '-c', CHECK_URLS], cwd=ROOT,
+        stdout=subprocess.PIPE, universal_newlines=True)
+    if urls.returncode == 2:
+        print('Urls of the registry are not checked: {}'.format(
+            urls.stdout.strip()))
+    elif urls.returncode or urls.stdout.strip():
+        print('Urls of the registry differ from the modules:\n{}'.format(
+            urls.stdout.strip()))
+        failed = True
+    if median > args.max_ms:
+        print('Median {:.1f} ms exceeds {:.1f} ms'.format(median,
+                                                          args.max_ms))
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
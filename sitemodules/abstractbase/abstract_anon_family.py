@@ -20,6 +20,11 @@ class AnonFamily(Uploader, ABC):
         return await self.anon_family_upload_logic(
             self.url, file_with_path, upload_name)
 
+    async def _direct_link(self, dl_link):
+        html, _ = await self._get_html_and_url(dl_link)
+        link = re.findall(r'id="download-url"[^>]*href="(.*?)"', html)
+        return link[0] if link else None
+
     async def anon_family_upload_logic(self, url, file_with_path,
                                        filename):
         verbose_name = self._verbose_name(file_with_path)
@@ -3,7 +3,7 @@
 from abc import ABC, abstractmethod
 import asyncio
 import aiofiles
-from aiohttp_socks import SocksConnector
+import functools
 import aiohttp
 import os
 import uuid
@@ -13,7 +13,15 @@ import re
 from typing import Tuple, Union
 from urllib.parse import urlparse
 import platform
+import random
 import subprocess
+import time
+from .transfer import TransferProgress, ProgressReader
+from .context import UploadContext
+from .journal import UploadJournal
+
+
+MISMATCH_MARK = 'MISMATCH '  # before links of corrupted uploads
 
 
 class UploaderException(Exception):
@@ -35,9 +43,11 @@ class Uploader(ABC):
     overloaded abstract protect property: _file_maxsize.
     protect methods: _verbose_name, _verbose_size,
                     _get_html_and_url, _post_html_and_url.
+    overloaded protect methods: _direct_link, _resume_logic.
+    protect method for modules with link polling: _awaiting_link.
     overloaded abstract public property: url.
     protect fields: _counter, _session.
-    public methods: __call__.
+    public methods: __call__, prepare, queue_files, run_job, plan.
 
 
     Class-constructor use instruction:
@@ -61,11 +71,6 @@ class Uploader(ABC):
     a long time (fat files), but are guaranteed to return with an error.
     """
 
-    def __init__(self):
-        self.__headers = {'User-Agent':
-                          'Mozilla/5.0 (Windows NT 6.1; rv:24.0) '
-                          'Gecko/20100101 Firefox/24.0'}
-
     def __call__(self, files_path: str, result_filename: str = '',
                  filter_extensions=None,
                  need_to_exclude_uploaded: bool = True,
@@ -74,7 +79,19 @@ class Uploader(ABC):
                  post_req_time_out_sec: int = 60 * 60 * 2,
                  sort_alphabetically: bool = True,
                  open_folder_with_result: bool = False,
-                 write_the_results_to_a_file: bool = True) -> None:
+                 write_the_results_to_a_file: bool = True,
+                 stall_idle_sec: int = 120,
+                 stall_min_speed_kbs: float = 1,
+                 stall_window_sec: int = 300,
+                 response_idle_sec: int = 600,
+                 upload_retries: int = 2,
+                 verify_samples: int = 0,
+                 verify_full_size_mb: float = 1,
+                 verify_limit: int = 2,
+                 verify_timeout_sec: int = 60,
+                 keepalive_sec: int = 300,
+                 prewarm_connections: bool = True,
+                 progress_interval_sec: int = 60) -> None:
         """The main method for calling an instance of a class
 
         :param files_path: dir path with files to be uploaded
@@ -120,7 +137,9 @@ class Uploader(ABC):
         To upload a file without a Tor, you can specify tor_port
         as -1 (or less) or 2**16 (or greater).
         :param upload_limit: an integer variable (default 3)
-        maximum number of asynchronous post-requests.
+        maximum number of files uploaded at once (workers taking files
+        from the queue). A file frees its worker once it's posted,
+        polling of links and verification don't take slots.
         :param post_req_time_out_sec: an integer variable
         (default 60*60*2 = 7200 = 2 hours) time that must pass before
         throwing an exception in post_html_and_dict method.
@@ -138,19 +157,100 @@ class Uploader(ABC):
         with result file in an explorer if it exists.
         :param write_the_results_to_a_file: if true write new results
         to the __result_filename
+        :param stall_idle_sec: an integer variable (default 120)
+        if no byte of the file was sent for this time the post-request
+        is aborted as stalled. 0 - disabled.
+        :param stall_min_speed_kbs: a float variable (default 1)
+        min average upload speed in KB/s over stall_window_sec,
+        a slower post-request is aborted as stalled. 0 - disabled.
+        :param stall_window_sec: an integer variable (default 300)
+        sliding window for stall_min_speed_kbs.
+        :param response_idle_sec: an integer variable (default 600)
+        time to wait for a response after the whole file was sent.
+        0 - disabled (only post_req_time_out_sec is left).
+        :param upload_retries: an integer variable (default 2)
+        how many times a stalled or corrupted (see verify_samples) file
+        is put back in the queue. The aborted connection is closed
+        so the retry uses a new one.
+        :param verify_samples: an integer variable (default 0 - disabled)
+        count of byte ranges (64 KB, the first and the last are always
+        in, so at least 2) to download after the upload and compare
+        with the local file. It works only for modules that override
+        _direct_link. If the ranges or the size differs the file is
+        uploaded again, if there are no retries left the link is
+        written to the result file with MISMATCH_MARK before it,
+        such lines don't exclude the file from the next upload.
+        :param verify_full_size_mb: a float variable (default 1)
+        files up to this size are downloaded fully for verification.
+        :param verify_limit: an integer variable (default 2)
+        maximum number of asynchronous verifications, they don't take
+        the upload_limit slots.
+        :param verify_timeout_sec: an integer variable (default 60)
+        timeout of a get-request of a range for verification,
+        if it expires the file is considered as verified.
+        :param keepalive_sec: an integer variable (default 300)
+        how long an idle connection is kept in the pool. Every new
+        connection over Tor costs TCP+SOCKS+TLS handshakes (seconds),
+        a reused one costs nothing.
+        :param prewarm_connections: if true open a connection to the
+        post host when a file was sent and the next file in the queue
+        goes to the same site, so its post-request doesn't wait
+        for handshakes.
+        :param progress_interval_sec: an integer variable (default 60)
+        on a terminal the status line with uploaded bytes, speed, ETA
+        and active files is refreshed every second, otherwise it's
+        printed every progress_interval_sec. 0 - disabled.
         :return: list of tuple(%upload_name%, %url%)
         if  _upload_logic has a correct return
         """
 
-        self.__loop = asyncio.get_event_loop()
-        self.__connector = SocksConnector.from_url(
-            'socks5://localhost:{}'.format(tor_port), rdns=True) \
-            if 0 <= tor_port <= 2 ** 16 - 1 else None
-
+        context = UploadContext(
+            tor_port=tor_port, upload_limit=upload_limit,
+            post_req_time_out_sec=post_req_time_out_sec,
+            stall_idle_sec=stall_idle_sec,
+            stall_min_speed_kbs=stall_min_speed_kbs,
+            stall_window_sec=stall_window_sec,
+            response_idle_sec=response_idle_sec,
+            upload_retries=upload_retries, verify_samples=verify_samples,
+            verify_full_size_mb=verify_full_size_mb,
+            verify_limit=verify_limit,
+            verify_timeout_sec=verify_timeout_sec,
+            keepalive_sec=keepalive_sec,
+            prewarm_connections=prewarm_connections,
+            progress_interval_sec=progress_interval_sec)
+        self.prepare(context, files_path, result_filename, filter_extensions,
+                     need_to_exclude_uploaded,
+                     number_of_letters_in_the_randomise_name,
+                     sort_alphabetically, open_folder_with_result,
+                     write_the_results_to_a_file)
+        return context.run([self])[0]
+
+    def prepare(self, context: UploadContext, files_path: str,
+                result_filename: str = '', filter_extensions=None,
+                need_to_exclude_uploaded: bool = True,
+                number_of_letters_in_the_randomise_name: int = 12,
+                sort_alphabetically: bool = True,
+                open_folder_with_result: bool = False,
+                write_the_results_to_a_file: bool = True,
+                priority: int = 0) -> 'Uploader':
+        """
+        Bind a folder to the context shared with other uploaders.
+        Uploaders prepared with the same context are run by
+        context.run in one session with common upload workers,
+        so a batch of folders is uploaded as one queue.
+        The parameters are described in __call__.
+
+        :param priority: an integer variable (default 0)
+        files of the uploader with a higher priority are taken by free
+        workers before the files with a lower one.
+        :return: self
+        """
         if os.path.splitext(urlparse(self.url).netloc)[-1] == '.onion' \
-                and not self.__connector:
+                and not context.use_tor:
             raise UploaderException('To load onion hosts you need'
                                     ' to specify TOR port')
+        self.__context = context
+        self.__priority = priority
         self.__result_filename = self.__generate_result_name(
             result_filename, files_path)
         self.__count_random_chars \
@@ -158,18 +258,30 @@ class Uploader(ABC):
         self.__files_dict = self.__get_file_and_name_to_upload(
             files_path, filter_extensions, need_to_exclude_uploaded
         )
-        self.__up_semaphore = asyncio.BoundedSemaphore(upload_limit,
-                                                       loop=self.__loop)
-        self.__post_req_time_out_sec = post_req_time_out_sec
+        self.__journal = context.journal(self.__result_filename + '.journal')
+        self.__journal.forget(self.__get_root_domain, self.__get_excluded())
+        for file in self.__files_dict:
+            # a posted file must be polled with the name it was posted
+            awaiting = self.__journal.awaiting(self.__get_root_domain, file)
+            if awaiting:
+                self.__files_dict[file] = awaiting[0]
+        for file in self.__files_dict:
+            context.progress.add((self, file), os.path.getsize(file))
+        self.__stalled = set()  # files whose post-request was aborted
+        self.__releases = {}  # file: function freeing its worker
+        self.__timings = {}  # file: (post sec, bytes)
+        self.__results = []  # futures of the files results
+        self.__measured = [0, 0.0, 0.0, 0]  # bytes, post, latency, files
         self._counter = 0  # successful post request counter
         self.__need_to_sort = sort_alphabetically
         self.__open_result_folder = open_folder_with_result
         self.__write_result_to_file = write_the_results_to_a_file
-        self._session = None  # main asynchronous aiohttp.ClientSession
-        #  initialization in the __main_method
-        result = self.__loop.run_until_complete(self.__main_method())
-        self.__loop.close()
-        return result
+        return self
+
+    @property
+    def _session(self) -> aiohttp.ClientSession:
+        """main asynchronous aiohttp.ClientSession of the context"""
+        return self.__context.session
 
     @property
     def __get_root_domain(self):
@@ -192,25 +304,26 @@ class Uploader(ABC):
         return os.path.join(default_path, filename)
 
     def __files_with_extensions_and_size(self, files_path, filter_extensions):
-        all_files_in_folder = []
-
-        for filename in os.listdir(files_path):
-            file_with_path = os.path.join(files_path, filename)
-            if os.path.isfile(file_with_path):
-                if os.path.getsize(file_with_path) < self._file_maxsize:
-                    all_files_in_folder.append(filename)
-        if not filter_extensions:
-            return all_files_in_folder
-        filter_extensions = [ext for ext in filter_extensions if ext not in
-                             ['*', '+', '?']]
-        if not filter_extensions:
-            raise UploaderException('Bad extensions')
-        try:
-            filter_extensions = "|".join(filter_extensions).replace('.', '\.')
-            return [file for file in all_files_in_folder if
-                    re.search(filter_extensions, file)]
-        except Exception as e:
-            raise UploaderException("Can't parse extensions", e)
+        """:return: (suitable files, count of suitable but oversize files)"""
+        all_files_in_folder = [filename for filename
+                               in os.listdir(files_path)
+                               if os.path.isfile(os.path.join(files_path,
+                                                              filename))]
+        if filter_extensions:
+            filter_extensions = [ext for ext in filter_extensions
+                                 if ext not in ['*', '+', '?']]
+            if not filter_extensions:
+                raise UploaderException('Bad extensions')
+            try:
+                filter_extensions = "|".join(filter_extensions).replace(
+                    '.', '\.')
+                all_files_in_folder = [file for file in all_files_in_folder
+                                       if re.search(filter_extensions, file)]
+            except Exception as e:
+                raise UploaderException("Can't parse extensions", e)
+        files = [file for file in all_files_in_folder if os.path.getsize(
+            os.path.join(files_path, file)) < self._file_maxsize]
+        return files, len(all_files_in_folder) - len(files)
 
     def __get_excluded(self, full_line=False):
         if not os.path.exists(self.__result_filename):
@@ -221,7 +334,9 @@ class Uploader(ABC):
                     else line.strip() for line in file if
                     len(line.strip().split(':')) > 1 and
                     line.strip().split(':', maxsplit=1)[1].count(
-                        self.__get_root_domain)]
+                        self.__get_root_domain) and
+                    not line.strip().split(':', maxsplit=1)[1].startswith(
+                        MISMATCH_MARK)]
 
     def __sort_results(self):
         if not os.path.exists(self.__result_filename):
@@ -238,8 +353,12 @@ class Uploader(ABC):
             file.write('\n')
         return 1
 
-    def __get_file_and_name_to_upload(self, files_path, filter_extensions,
-                                      need_to_exclude_uploaded):
+    def __scan(self, files_path, filter_extensions, need_to_exclude_uploaded):
+        """
+        Folder scan shared by the upload and the plan.
+        :return: (files_path, suitable files, files to upload,
+        count of oversize files)
+        """
         if platform.system() == "Windows":
             files_path = files_path.strip()
         if not os.path.exists(files_path):
@@ -250,19 +369,47 @@ class Uploader(ABC):
             excluded = self.__get_excluded()
         else:
             excluded = []
-        all_files = self.__files_with_extensions_and_size(
+        all_files, oversize = self.__files_with_extensions_and_size(
             files_path, filter_extensions)
+        files = [file for file in all_files if file not in excluded]
+        return files_path, all_files, files, oversize
+
+    def __get_file_and_name_to_upload(self, files_path, filter_extensions,
+                                      need_to_exclude_uploaded):
+        files_path, all_files, files, _ = self.__scan(
+            files_path, filter_extensions, need_to_exclude_uploaded)
         if not all_files:
             print('There are no files in the folder with '
                   'suitable sizes or extensions')
             return dict()
-        files = [file for file in all_files if file not in excluded]
         if not files:
             print('All files from the folder have already been uploaded to '
                   + self.url)
             return dict()
         return self.__generate_file_pairs_dict(files, files_path)
 
+    def plan(self, files_path: str, result_filename: str = '',
+             filter_extensions=None,
+             need_to_exclude_uploaded: bool = True) -> dict:
+        """
+        Scan the folder like a real upload does, but w/o uploading.
+        The parameters are described in __call__.
+
+        :return: dict(site, path, result, files, bytes, oversize, uploaded)
+        site - key of the site in ThroughputHistory, files and bytes -
+        what would be uploaded, oversize and uploaded - skipped files
+        """
+        self.__result_filename = self.__generate_result_name(
+            result_filename, files_path)
+        files_path, all_files, files, oversize = self.__scan(
+            files_path, filter_extensions, need_to_exclude_uploaded)
+        return dict(site=self.__get_root_domain, path=files_path,
+                    result=self.__result_filename, files=len(files),
+                    bytes=sum(os.path.getsize(os.path.join(files_path, file))
+                              for file in files),
+                    oversize=oversize,
+                    uploaded=len(all_files) - len(files))
+
     @staticmethod
     def __get_ext_of_file(filename, max_parts_count=2):
         ext = re.findall('(\.\w+)(?:|$)', filename)[-max_parts_count:]
@@ -293,24 +440,36 @@ class Uploader(ABC):
             files_dict[_wp(filename)] = random_name
         return files_dict
 
-    async def __main_method(self):
-        if len(self.__files_dict):
-            async with aiohttp.ClientSession(
-                    connector=self.__connector, loop=self.__loop,
-                    headers=self.__headers) as self._session:
-
-                tasks = [self.__wrapped_upload_logic(file, filename)
-                         for file, filename in self.__files_dict.items()]
-                result = await asyncio.gather(*tasks)
-        else:
-            result = []
+    def queue_files(self):
+        """
+        Put files of the prepared folder in the queue of the context,
+        called by UploadContext.run before the workers start.
+        """
+        self.__results = []
+        for file, filename in self.__files_dict.items():
+            future = self.__context.loop.create_future()
+            self.__results.append(future)
+            self.__context.put(self.__priority, functools.partial(
+                self.__upload_file, file, filename, future, 0),
+                self.__get_root_domain)
+
+    async def run_job(self):
+        """Wait for the queued files, called by UploadContext.run"""
+        result = await asyncio.gather(*self.__results)
+        size, post_sec, latency, files = self.__measured
+        if files and post_sec:
+            self.__context.history.update(self.__get_root_domain,
+                                          size / post_sec, latency / files,
+                                          files)
         failed = len(self.__files_dict) - self._counter
         # in fact, the result message may be incorrect if the uploading
         # logic was incorrectly implemented
         if not failed and len(self.__files_dict):
-            print('All files were uploaded successfully.')
+            print('All files were uploaded successfully. Results: {}'.format(
+                self.__result_filename))
         elif failed:
-            print('Failed to upload {} files!'.format(failed))
+            print('Failed to upload {} files! Results: {}'.format(
+                failed, self.__result_filename))
         if self.__need_to_sort and self.__sort_results():
             print('Result file were sorted')
         path = self.__get_result_file_path
@@ -328,27 +487,257 @@ class Uploader(ABC):
         finally:
             return result
 
-    async def __wrapped_upload_logic(self, file, filename):
+    async def __upload_file(self, file, filename, future, retry, release,
+                            resume=True):
+        """
+        Worker job: resume or upload the file, verify it and write
+        the result. The worker is released as soon as the file is posted
+        (or its link is polled, see _awaiting_link), so polling and
+        verification don't hold an upload slot.
+        """
+        context = self.__context
+        logic_sec = None
+        self.__releases[file] = release
         try:
-            arg = await self._upload_logic(file, filename)
-            if len(arg) != 2:
-                print('Error in _upload_logic module. '
-                      'The method should return a tuple of two elements')
-                return arg
-            filename, url = arg
-            if self.__write_result_to_file:
-                if not url:
-                    return filename, url
-                try:
-                    await self.__write_result(filename, url)
-                except UploaderException as e:
-                    print('{} {}'.format(str(e), filename))
-                    return filename, url
+            arg = None
+            if resume and not retry and self.__journal.awaiting(
+                    self.__get_root_domain, file):
+                release()
+                arg = await self.__resume(file, filename)
+                if arg is None:
+                    # the link is lost, the file is posted again in a slot
+                    context.put(self.__priority, functools.partial(
+                        self.__upload_file, file, filename, future, retry,
+                        resume=False), self.__get_root_domain)
+                    context.task_done()
+                    return
+            if arg is None:
+                self.__record(file, UploadJournal.QUEUED)
+                started = time.monotonic()
+                arg = await self._upload_logic(file, filename)
+                logic_sec = time.monotonic() - started
+        except Exception as e:
+            print(e)
+            arg = filename, None
+        finally:
+            self.__releases.pop(file, None)
+        release()
+        await self.__finish_file(file, filename, future, retry, arg,
+                                 logic_sec)
+
+    async def __finish_file(self, file, filename, future, retry, arg,
+                            logic_sec):
+        """
+        Verify the upload and write the result, a stalled or corrupted
+        file is put back in the queue.
+        """
+        context = self.__context
+        mismatch = None
+        try:
+            if file in self.__stalled:
+                self.__stalled.discard(file)
+                failed = True
+            elif await self.__verified(file, arg):
+                failed = False
+                if logic_sec is not None:
+                    self.__measure(file, arg, logic_sec)
             else:
-                return file, url
+                self._counter -= 1
+                mismatch = arg[1]
+                arg = arg[0], None
+                failed = True
+            if failed and retry < context.upload_retries:
+                print('Rescheduling {} [retry {}/{}]'.format(
+                    self._verbose_name(file), retry + 1,
+                    context.upload_retries))
+                context.put(self.__priority, functools.partial(
+                    self.__upload_file, file, filename, future, retry + 1),
+                    self.__get_root_domain)
+                return
+            # a resumed file wasn't sent in this run
+            sent = not failed and logic_sec is not None \
+                and len(arg) == 2 and bool(arg[1])
+            context.progress.settle((self, file), sent)
+            if mismatch:
+                await self.__flag_mismatch(arg[0], mismatch)
+            future.set_result(await self.__save_result(file, arg))
         except Exception as e:
             print(e)
-            return filename, None
+            context.progress.settle((self, file), False)
+            future.set_result((filename, None))
+        finally:
+            context.task_done()
+
+    async def __flag_mismatch(self, filename, url):
+        print('Verification failed for {} after all retries: {}'.format(
+            filename, url))
+        if not self.__write_result_to_file:
+            return
+        try:
+            await self.__write_result(filename, MISMATCH_MARK + str(url))
+        except UploaderException as e:
+            print('{} {}'.format(str(e), filename))
+
+    async def __save_result(self, file, arg):
+        if len(arg) != 2:
+            print('Error in _upload_logic module. '
+                  'The method should return a tuple of two elements')
+            return arg
+        filename, url = arg
+        if self.__write_result_to_file:
+            if not url:
+                return filename, url
+            try:
+                await self.__write_result(filename, url)
+            except UploaderException as e:
+                print('{} {}'.format(str(e), filename))
+                return filename, url
+            self.__record(file, UploadJournal.DONE)
+            return filename, url
+        if url:
+            self.__record(file, UploadJournal.DONE)
+        return file, url
+
+    def __measure(self, file, arg, logic_sec):
+        timing = self.__timings.pop(file, None)
+        if not timing or len(arg) != 2 or not arg[1]:
+            return
+        post_sec, size = timing
+        self.__measured[0] += size
+        self.__measured[1] += post_sec
+        self.__measured[2] += max(logic_sec - post_sec, 0)
+        self.__measured[3] += 1
+
+    async def __resume(self, file, filename):
+        """
+        Poll the link of a file posted before a crash/stop.
+        :return: result of _resume_logic if the link was got else None
+        """
+        awaiting = self.__journal.awaiting(self.__get_root_domain, file)
+        if not awaiting:
+            return None
+        print('Resuming link polling for {}'.format(self._verbose_name(file)))
+        counter = (self._counter + 1, len(self.__files_dict))
+        arg = await self._resume_logic(file, filename, awaiting[1], counter)
+        if len(arg) != 2 or not arg[1]:
+            return None
+        self._counter += 1
+        return arg
+
+    def __record(self, file, state, poll=None):
+        name = self.__files_dict.get(file)
+        if name is None:
+            # the module opened the file by another path,
+            # the file is uploaded again after a crash
+            return
+        self.__journal.record(self.__get_root_domain, file, name, state,
+                              poll)
+
+    def _awaiting_link(self, file_with_path: str, poll_url: str) -> None:
+        """
+        Call it in _upload_logic when the file is posted but the link
+        has to be polled, so after a crash the polling is resumed with
+        _resume_logic instead of uploading the file again.
+        The upload slot of the file is freed for the next file.
+
+        :param file_with_path: real filename with path
+        :param poll_url: url to poll for the download link
+        """
+        self.__record(file_with_path, UploadJournal.AWAITING,
+                      str(poll_url))
+        release = self.__releases.pop(file_with_path, None)
+        if release:
+            release()  # the link is polled w/o an upload slot
+
+    async def __verified(self, file, arg):
+        """
+        Compare sampled byte ranges of the uploaded file with the local one.
+        Returns False only on a real mismatch, a file that can't be
+        verified (disabled, no link, unsupported module, network error)
+        is considered as verified.
+        """
+        if not self.__context.verify_samples or len(arg) != 2 or not arg[1]:
+            return True
+        verbose_name = self._verbose_name(file)
+        size = os.path.getsize(file)
+        if not size:
+            return True
+        whole = size <= self.__context.verify_full_size
+        if whole:
+            ranges = [(0, size - 1)]
+        else:
+            ranges = self.__sample_ranges(size, self.__context.verify_samples)
+        async with self.__context.verify_semaphore:
+            try:
+                direct_link = await self._direct_link(arg[1])
+                if not direct_link:
+                    return True
+                with open(file, 'rb') as local:
+                    for start, end in ranges:
+                        data, total = await self.__get_range(
+                            direct_link, start, end, whole)
+                        if data is None:
+                            print("Can't verify {}: ranges aren't "
+                                  "supported".format(verbose_name))
+                            return True
+                        if total is not None and total != size:
+                            print('Verification failed for {}: size is {} '
+                                  'instead of {}'.format(verbose_name,
+                                                         total, size))
+                            return False
+                        local.seek(start)
+                        if local.read(end - start + 1) != data:
+                            print('Verification failed for {}: bytes {}-{} '
+                                  'differ'.format(verbose_name, start, end))
+                            return False
+            except UploaderException as e:
+                print("Can't verify {}: {}".format(verbose_name, str(e)))
+                return True
+        print('Verified {} [{} range(s)]'.format(verbose_name, len(ranges)))
+        return True
+
+    @staticmethod
+    def __sample_ranges(size, count, chunk=2 ** 16):
+        chunk = min(chunk, size)
+        count = max(count, 2)
+        starts = [size - chunk, 0] + [random.randrange(size - chunk + 1)
+                                      for _ in range(count - 2)]
+        return [(start, start + chunk - 1)
+                for start in sorted(set(starts[:count]))]
+
+    async def __get_range(self, url, start, end, whole=False):
+        """
+        :param whole: the range is the whole local file, so a response
+        w/o range support is the remote file itself
+        :return: (bytes, full size of the remote file or None)
+        or (None, None) if the server doesn't support ranges
+        """
+        headers = {'Range': 'bytes={}-{}'.format(start, end)}
+        try:
+            async with self._session.get(
+                    url, headers=headers,
+                    timeout=self.__context.verify_timeout_sec) as res:
+                if res.status == 206:
+                    total = res.headers.get('Content-Range', '')
+                    total = total.rsplit('/', 1)[-1]
+                    return (await res.read(),
+                            int(total) if total.isdigit() else None)
+                if res.status == 200 and \
+                        res.content_length == end - start + 1:
+                    return await res.read(), res.content_length
+                if res.status == 200 and whole:
+                    if res.content_length is not None:
+                        # the size differs, the body isn't needed
+                        return b'', res.content_length
+                    data = await res.read()
+                    return data, len(data)
+                if res.status == 200:
+                    return None, None
+                raise UploaderException('Bad status {}'.format(res.status))
+        except UploaderException:
+            raise
+        except Exception as e:
+            raise UploaderException('Error getting {}'.format(url), e)
 
     async def __write_result(self, filename: str, url: str) -> None:
         """
@@ -442,8 +831,9 @@ class Uploader(ABC):
         """
 
         try:
-            file = [_[2] for _ in form_data.__dict__['_fields']
-                    if type(_[2]) == io.BufferedReader][0]
+            index, file = [(i, _[2]) for i, _ in
+                           enumerate(form_data.__dict__['_fields'])
+                           if isinstance(_[2], io.BufferedReader)][0]
         except IndexError:
             raise UploaderException('Form w/o file')
 
@@ -454,21 +844,116 @@ class Uploader(ABC):
             raise UploaderException('File exceed the maximum size',
                                     'File is {}'.format(verbose_file_name))
         try:
-            async with self.__up_semaphore:
-                print('Uploading: {}'.format(verbose_file_name))
-                async with self._session.post(
-                        post_url, data=form_data,
-                        timeout=self.__post_req_time_out_sec,
-                        verify_ssl=verify_ssl) as res:
-                    html = await res.text()
-                    self._counter += 1
-                    counter = (self._counter, len(self.__files_dict))
-                    # print(verbose_file_name + ' uploaded')
-                    return html, res.__dict__['_real_url'], counter
+            print('Uploading: {}'.format(verbose_file_name))
+            self.__record(real_file_name, UploadJournal.POSTING)
+            progress = TransferProgress(
+                verbose_file_name,
+                os.path.getsize(real_file_name) - file.tell())
+            reader = ProgressReader(real_file_name, progress)
+            reader.seek(file.tell())
+            type_options, headers, _ = form_data.__dict__['_fields'][index]
+            form_data.__dict__['_fields'][index] = (type_options, headers,
+                                                    reader)
+            self.__context.progress.start((self, real_file_name),
+                                         progress)
+            uploaded = False
+            try:
+                html, url = await self.__watch_transfer(
+                    self.__post(post_url, form_data, verify_ssl, progress),
+                    post_url, real_file_name, progress)
+                uploaded = True
+            finally:
+                reader.close()
+                self.__context.progress.finish((self, real_file_name),
+                                               uploaded)
+            self.__timings[real_file_name] = (
+                time.monotonic() - progress.started, progress.size)
+            self._counter += 1
+            counter = (self._counter, len(self.__files_dict))
+            return html, url, counter
         except Exception as e:
             raise UploaderException('An error occurred while uploading {}!'.
                                     format(verbose_file_name), e)
 
+    async def __post(self, post_url, form_data, verify_ssl, progress):
+        async with self._session.post(
+                post_url, data=form_data,
+                timeout=self.__context.post_req_time_out_sec,
+                verify_ssl=verify_ssl) as res:
+            progress.touch()
+            return await res.text(), res.__dict__['_real_url']
+
+    async def __prewarm(self, url):
+        """HEAD request leaves an idle keep-alive connection in the pool"""
+        parsed = urlparse(url)
+        try:
+            async with self._session.head(
+                    '{}://{}/'.format(parsed.scheme, parsed.netloc),
+                    allow_redirects=False):
+                pass
+        except Exception:
+            pass
+
+    async def __watch_transfer(self, coro, post_url, real_file_name,
+                               progress):
+        """
+        Run the post-request and abort it if it stalls.
+        The file is marked in __stalled so __finish_file can put
+        it back in the queue after the worker was released.
+        Once the body is sent a connection for the next queued
+        file is opened in the background if that file goes
+        to the same site.
+        """
+        task = asyncio.ensure_future(coro)
+        prewarmed = not self.__context.prewarm_connections
+        try:
+            while True:
+                done, _ = await asyncio.wait([task], timeout=1)
+                if done:
+                    return task.result()
+                if not prewarmed and progress.body_sent \
+                        and self.__context.next_site \
+                        == self.__get_root_domain:
+                    prewarmed = True
+                    self.__context.spawn(self.__prewarm(post_url))
+                context = self.__context
+                reason = progress.stall_reason(
+                    context.stall_idle_sec, context.stall_min_speed,
+                    context.stall_window_sec, context.response_idle_sec)
+                if reason:
+                    self.__stalled.add(real_file_name)
+                    raise UploaderException('Transfer stalled', reason)
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.wait([task])
+
+    async def _direct_link(self, dl_link: str) -> Union[str, None]:
+        """
+        Overload it to enable verification of uploads (verify_samples)
+        for the module. Default - verification isn't supported.
+
+        :param dl_link: download link returned from _upload_logic
+        :return: direct link to the file content which supports
+        Range requests or None
+        """
+        return None
+
+    async def _resume_logic(self, file_with_path: str, upload_name: str,
+                            poll_url: str, counter: Tuple[int, int]) \
+            -> Tuple[str, Union[str, None]]:
+        """
+        Overload it in modules that call _awaiting_link.
+        Default - the link can't be polled, the file is uploaded again.
+
+        :param file_with_path: real filename with path
+        :param upload_name: name the file was posted with
+        :param poll_url: url passed to _awaiting_link
+        :param counter: (uploaded_counter, total_files) for console output
+        :return: (%real_file_name%, %url% or None)
+        """
+        return self._verbose_name(file_with_path), None
+
     @abstractmethod
     async def _upload_logic(self, file_with_path: str, upload_name: str,
                             **kwargs) -> Tuple[str, Union[str, None]]:
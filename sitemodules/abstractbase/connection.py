@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import time
+import aiohttp
+
+
+class ConnectionStats:
+    """
+    Counts new and reused connections of a session via aiohttp tracing.
+    Time of a new connection includes TCP, SOCKS (Tor circuit) and TLS
+    handshakes, so it is what every reused connection saves.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.reused = 0
+        self.handshake_time = 0.0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        config = aiohttp.TraceConfig()
+        config.on_connection_create_start.append(self.__create_start)
+        config.on_connection_create_end.append(self.__create_end)
+        config.on_connection_reuseconn.append(self.__reuse)
+        return config
+
+    async def __create_start(self, session, ctx, params):
+        ctx.create_start = time.monotonic()
+
+    async def __create_end(self, session, ctx, params):
+        self.created += 1
+        self.handshake_time += time.monotonic() - ctx.create_start
+
+    async def __reuse(self, session, ctx, params):
+        self.reused += 1
+
+    def __str__(self):
+        average = self.handshake_time / self.created if self.created else 0
+        return ('Connections: {} opened (handshakes {:.1f} sec, '
+                'avg {:.1f} sec), {} reused (~{:.1f} sec saved)'.format(
+                    self.created, self.handshake_time, average,
+                    self.reused, average * self.reused))
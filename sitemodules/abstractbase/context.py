@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import functools
+import heapq
+import itertools
+import os
+import aiohttp
+from aiohttp_socks import SocksConnector
+from .connection import ConnectionStats
+from .history import ThroughputHistory
+from .journal import UploadJournal
+from .progress import ProgressBoard
+
+
+class UploadContext:
+    """
+    Network state and settings shared by all uploads of a run:
+    connector, session, queue of files and verification slots.
+    Parameters are described in Uploader.__call__.
+    Uploaders bound to the context with Uploader.prepare
+    are run in one session by run method: their files go to one heap
+    ordered by (priority, arrival) and upload_limit workers pop them,
+    so a file takes network resources only when a worker takes it.
+    """
+
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.1; rv:24.0) '
+                             'Gecko/20100101 Firefox/24.0'}
+
+    def __init__(self, tor_port: int = 9050, upload_limit: int = 3,
+                 post_req_time_out_sec: int = 60 * 60 * 2,
+                 stall_idle_sec: int = 120,
+                 stall_min_speed_kbs: float = 1,
+                 stall_window_sec: int = 300,
+                 response_idle_sec: int = 600,
+                 upload_retries: int = 2,
+                 verify_samples: int = 0,
+                 verify_full_size_mb: float = 1,
+                 verify_limit: int = 2,
+                 verify_timeout_sec: int = 60,
+                 keepalive_sec: int = 300,
+                 prewarm_connections: bool = True,
+                 progress_interval_sec: int = 60):
+        self.loop = asyncio.get_event_loop()
+        self.use_tor = 0 <= tor_port <= 2 ** 16 - 1
+        connector_kwargs = dict(keepalive_timeout=keepalive_sec,
+                                enable_cleanup_closed=True)
+        self.connector = SocksConnector.from_url(
+            'socks5://localhost:{}'.format(tor_port), rdns=True,
+            **connector_kwargs) \
+            if self.use_tor else aiohttp.TCPConnector(**connector_kwargs)
+        self.upload_limit = upload_limit
+        self.__queue = []  # heap of (-priority, arrival, site, job)
+        self.__arrival = itertools.count()
+        self.__pending = 0  # queued and running jobs
+        self.__wakeup = asyncio.Event()
+        self.__tasks = set()  # background tasks of the session
+        self.post_req_time_out_sec = post_req_time_out_sec
+        self.stall_idle_sec = stall_idle_sec
+        self.stall_min_speed = stall_min_speed_kbs * 2 ** 10
+        self.stall_window_sec = stall_window_sec
+        self.response_idle_sec = response_idle_sec
+        self.upload_retries = upload_retries
+        self.verify_samples = verify_samples
+        self.verify_full_size = int(verify_full_size_mb * 2 ** 20)
+        self.verify_semaphore = asyncio.BoundedSemaphore(verify_limit,
+                                                         loop=self.loop)
+        self.verify_timeout_sec = verify_timeout_sec
+        self.prewarm_connections = prewarm_connections
+        self.connection_stats = ConnectionStats()
+        self.progress = ProgressBoard(progress_interval_sec)
+        self.history = ThroughputHistory()
+        self.__journals = {}
+        self.session = None  # main asynchronous aiohttp.ClientSession
+        #  initialization in the __main_method
+
+    def journal(self, filename: str) -> UploadJournal:
+        """One journal per file for uploaders sharing a result file"""
+        filename = os.path.abspath(filename)
+        if filename not in self.__journals:
+            self.__journals[filename] = UploadJournal(filename)
+        return self.__journals[filename]
+
+    @property
+    def next_site(self):
+        """site of the job a free worker takes next or None"""
+        return self.__queue[0][2] if self.__queue else None
+
+    def put(self, priority: int, job, site: str = None) -> None:
+        """
+        Queue a job, jobs with a higher priority are taken first,
+        with the same one - in order of arrival.
+        The job or a task it spawns must call task_done.
+
+        :param priority: priority of the job
+        :param job: coroutine function with one argument - release,
+        a function that frees the worker before the job ends
+        (e.g. while a link is polled)
+        :param site: site the job uploads to (default None)
+        """
+        heapq.heappush(self.__queue,
+                       (-priority, next(self.__arrival), site, job))
+        self.__pending += 1
+        self.__wakeup.set()
+
+    def task_done(self) -> None:
+        self.__pending -= 1
+        if not self.__pending:
+            self.__wakeup.set()
+
+    def spawn(self, coro) -> asyncio.Future:
+        """
+        Run a coroutine in the background, tasks still pending
+        are cancelled before the session is closed.
+        """
+        task = asyncio.ensure_future(coro)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+        return task
+
+    @staticmethod
+    def __release(released):
+        if not released.done():
+            released.set_result(None)
+
+    async def __worker(self):
+        while True:
+            if self.__queue:
+                _, _, _, job = heapq.heappop(self.__queue)
+                released = self.loop.create_future()
+                task = self.spawn(job(functools.partial(self.__release,
+                                                        released)))
+                await asyncio.wait([task, released],
+                                   return_when=asyncio.FIRST_COMPLETED)
+            elif not self.__pending:
+                return
+            else:
+                self.__wakeup.clear()
+                await self.__wakeup.wait()
+
+    def run(self, uploaders: list) -> list:
+        """
+        Run prepared uploaders in one session and close the loop.
+
+        :param uploaders: uploaders bound to the context
+        :return: list of results of the uploaders
+        """
+        result = self.loop.run_until_complete(self.__main_method(uploaders))
+        self.loop.close()
+        return result
+
+    async def __main_method(self, uploaders):
+        async with aiohttp.ClientSession(
+                connector=self.connector, loop=self.loop,
+                headers=self.headers,
+                trace_configs=[self.connection_stats.trace_config()]
+        ) as self.session:
+            progress = asyncio.ensure_future(self.progress.run())
+            workers = []
+            try:
+                for uploader in uploaders:
+                    uploader.queue_files()
+                workers = [asyncio.ensure_future(self.__worker())
+                           for _ in range(max(self.upload_limit, 1))]
+                result = await asyncio.gather(*[uploader.run_job()
+                                                for uploader in uploaders])
+            finally:
+                tasks = [progress] + workers + list(self.__tasks)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.wait(tasks)
+                for journal in self.__journals.values():
+                    await journal.flush()
+        if self.connection_stats.created or self.connection_stats.reused:
+            print(self.connection_stats)
+        return result
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+DEFAULT_HISTORY = os.path.join(os.path.expanduser('~'), 'TUpl',
+                               'history.json')
+
+
+class ThroughputHistory:
+    """
+    Measured upload speed and per-file latency of every site,
+    persisted between runs for the plan.
+    throughput - bytes/sec of one post-request,
+    latency - sec per file spent outside the post-request
+    (getting tokens, polling links) w/o waiting for a slot.
+    Values of a run are merged with exponential smoothing.
+    """
+
+    SMOOTHING = 0.3  # weight of the last run
+
+    def __init__(self, filename: str = DEFAULT_HISTORY):
+        self.__filename = filename
+        try:
+            with open(filename) as file:
+                self.__sites = json.load(file)
+        except (OSError, ValueError):
+            self.__sites = {}
+
+    def get(self, site: str):
+        """:return: dict(throughput, latency, files) or None"""
+        return self.__sites.get(site)
+
+    def update(self, site: str, throughput: float, latency: float,
+               files: int) -> None:
+        if throughput <= 0:  # e.g. only empty files were posted
+            return
+        old = self.__sites.get(site)
+        if old:
+            throughput = old['throughput'] + self.SMOOTHING * (
+                throughput - old['throughput'])
+            latency = old['latency'] + self.SMOOTHING * (
+                latency - old['latency'])
+            files += old['files']
+        self.__sites[site] = dict(throughput=throughput, latency=latency,
+                                  files=files)
+        try:
+            os.makedirs(os.path.dirname(self.__filename), exist_ok=True)
+            with open(self.__filename, 'w') as file:
+                json.dump(self.__sites, file, indent=2)
+        except OSError as e:
+            print("Can't save throughput history: {}".format(str(e)))
+
+    def estimate(self, site: str, files: int, size: int,
+                 upload_limit: int):
+        """
+        :return: sec to upload the files alone with upload_limit slots
+        or None w/o usable history of the site
+        """
+        if not files:
+            return 0
+        if not self.known(site):
+            return None
+        slot_sec = self.slot_sec(site, files, size)
+        return slot_sec / max(min(upload_limit, files), 1)
+
+    def known(self, site: str) -> bool:
+        """the site has a positive throughput to estimate with"""
+        measured = self.get(site)
+        return bool(measured) and measured.get('throughput', 0) > 0
+
+    def slot_sec(self, site: str, files: int, size: int):
+        """sec of a single slot needed for the files or None if unknown"""
+        if not self.known(site):
+            return None
+        measured = self.get(site)
+        return size / measured['throughput'] + files * measured['latency']
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+
+
+class UploadJournal:
+    """
+    Write-ahead journal of upload states, one JSON line per transition:
+    {"site": root domain, "file": abs path, "name": upload_name,
+    "state": ..., "poll": url}.
+    A result file (and so its journal) may be shared by several sites,
+    entries are kept per (site, file).
+    Lines are appended and synced in the executor of the loop,
+    transitions recorded during a write go to the next one with a single
+    fsync, so the event loop never waits for the disk. After a crash
+    the last line of a file is its last synced state, a lost awaiting
+    state costs a re-upload of the file, not the file itself.
+    States: queued -> posting -> awaiting (the file is posted,
+    the link is polled at "poll") -> done.
+    """
+
+    QUEUED = 'queued'
+    POSTING = 'posting'
+    AWAITING = 'awaiting'
+    DONE = 'done'
+
+    def __init__(self, filename: str):
+        self.__filename = filename
+        self.__lines = []  # lines waiting for the write
+        self.__writing = None  # future of the running write
+        self.__entries = self.__load()
+        self.__compact()
+
+    def __load(self):
+        entries = {}
+        if not os.path.exists(self.__filename):
+            return entries
+        with open(self.__filename) as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                    entries[(entry['site'], entry['file'])] = entry
+                except (ValueError, KeyError, TypeError):
+                    continue  # line torn by a crash
+        return entries
+
+    def __compact(self):
+        self.__entries = dict((key, entry) for key, entry
+                              in self.__entries.items()
+                              if entry['state'] != self.DONE)
+        if not self.__entries:
+            if os.path.exists(self.__filename):
+                os.remove(self.__filename)
+            return
+        with open(self.__filename, 'w') as file:
+            for entry in self.__entries.values():
+                file.write(json.dumps(entry) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def awaiting(self, site: str, file: str):
+        """
+        :return: (upload_name, poll url) if the file was posted
+        to the site in a previous run and its link wasn't got else None
+        """
+        entry = self.__entries.get((site, os.path.abspath(file)))
+        if not entry or entry['state'] != self.AWAITING:
+            return None
+        return entry['name'], entry['poll']
+
+    def forget(self, site: str, names: list) -> None:
+        """
+        Drop entries of files already uploaded to the site:
+        their done line may have been lost by a crash.
+
+        :param site: root domain of the site
+        :param names: names of files uploaded to the site
+        from the result file
+        """
+        names = set(names)
+        stale = [key for key in self.__entries
+                 if key[0] == site and os.path.basename(key[1]) in names]
+        if not stale:
+            return
+        for key in stale:
+            del self.__entries[key]
+        self.__compact()
+
+    def record(self, site: str, file: str, name: str, state: str,
+               poll: str = None) -> None:
+        entry = dict(site=site, file=os.path.abspath(file), name=name,
+                     state=state, poll=poll)
+        self.__entries[(site, entry['file'])] = entry
+        self.__lines.append(json.dumps(entry) + '\n')
+        if self.__writing is None:
+            self.__write()
+
+    async def flush(self) -> None:
+        """Wait until all recorded lines are synced"""
+        while self.__writing is not None:
+            await asyncio.wait([self.__writing])
+
+    def __write(self):
+        lines, self.__lines = self.__lines, []
+        self.__writing = asyncio.get_event_loop().run_in_executor(
+            None, self.__append, lines)
+        self.__writing.add_done_callback(self.__written)
+
+    def __written(self, future):
+        self.__writing = None
+        if not future.cancelled() and future.exception():
+            print("Can't write to the journal: {}".format(
+                str(future.exception())))
+        if self.__lines:
+            self.__write()
+
+    def __append(self, lines):
+        directory = os.path.dirname(self.__filename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        with open(self.__filename, 'a') as journal:
+            journal.write(''.join(lines))
+            journal.flush()
+            os.fsync(journal.fileno())
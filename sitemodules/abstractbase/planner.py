@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+from .history import ThroughputHistory
+from .progress import verbose_bytes, verbose_duration
+
+
+def print_plan(plans: list, upload_limit: int,
+               history: ThroughputHistory = None) -> None:
+    """
+    Print what a run would upload and how long it would take.
+
+    :param plans: results of Uploader.plan
+    :param upload_limit: maximum number of asynchronous post-requests
+    :param history: measured throughput of sites (default ~/TUpl/)
+    """
+    history = history or ThroughputHistory()
+    now = datetime.datetime.now()
+    sites = {}
+    for plan in plans:
+        print('{path} -> {site}: {files} files, {size} '
+              '(skipped: {oversize} oversize, {uploaded} already uploaded)'
+              .format(size=verbose_bytes(plan['bytes']), **plan))
+        files, size = sites.get(plan['site'], (0, 0))
+        sites[plan['site']] = (files + plan['files'], size + plan['bytes'])
+
+    slot_sec = 0.0
+    known_files = 0  # files of sites with history share the slots
+    unknown = []
+    for site, (files, size) in sorted(sites.items()):
+        estimate = history.estimate(site, files, size, upload_limit)
+        if estimate is None:
+            unknown.append(site)
+            print('{}: {} files, {} - no throughput history, '
+                  'upload once to measure it'.format(
+                      site, files, verbose_bytes(size)))
+            continue
+        if files:
+            slot_sec += history.slot_sec(site, files, size)
+            known_files += files
+        measured = history.get(site) or dict(throughput=0, latency=0)
+        print('{}: {} files, {} at {}/s + {:.0f} sec/file -> ~{} '
+              '(finish ~{:%Y-%m-%d %H:%M} if alone)'.format(
+                  site, files, verbose_bytes(size),
+                  verbose_bytes(measured['throughput']),
+                  measured['latency'], verbose_duration(estimate),
+                  now + datetime.timedelta(seconds=estimate)))
+    total_files = sum(files for files, _ in sites.values())
+    total_size = sum(size for _, size in sites.values())
+    if unknown and not known_files:
+        print('Total: {} files, {}, estimate unknown '
+              '(no throughput history)'.format(total_files,
+                                               verbose_bytes(total_size)))
+        return
+    total_sec = slot_sec / max(min(upload_limit, known_files), 1)
+    print('Total: {} files, {}, ~{} in {} slots (finish ~{:%Y-%m-%d %H:%M})'
+          '{}'.format(total_files, verbose_bytes(total_size),
+                      verbose_duration(total_sec), upload_limit,
+                      now + datetime.timedelta(seconds=total_sec),
+                      ' w/o {}'.format(', '.join(unknown))
+                      if unknown else ''))
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import shutil
+import sys
+import time
+from collections import deque
+
+
+def verbose_bytes(count: float) -> str:
+    for dimension in ('B', 'KB', 'MB', 'GB'):
+        if count < 2 ** 10:
+            return '{:.1f} {}'.format(count, dimension)
+        count /= 2 ** 10
+    return '{:.1f} TB'.format(count)
+
+
+def verbose_duration(sec: float) -> str:
+    sec = int(sec)
+    return '{}:{:02}:{:02}'.format(sec // 3600, sec // 60 % 60, sec % 60)
+
+
+class _StatusStream:
+    """
+    stdout wrapper that keeps the status line at the bottom:
+    the line is erased before any other output and redrawn after it.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.__status = ''
+        self.__shown = False
+
+    def write(self, text):
+        if self.__shown:
+            self.stream.write('\r\x1b[K')
+            self.__shown = False
+        self.stream.write(text)
+        if text.endswith('\n') and self.__status:
+            self.stream.write(self.__status)
+            self.__shown = True
+        return len(text)
+
+    def draw(self, status):
+        width = shutil.get_terminal_size().columns - 1
+        self.__status = status[:width]
+        self.stream.write('\r\x1b[K' + self.__status)
+        self.stream.flush()
+        self.__shown = True
+
+    def clear(self):
+        if self.__shown:
+            self.stream.write('\r\x1b[K')
+            self.stream.flush()
+        self.__shown = False
+
+    def __getattr__(self, item):
+        return getattr(self.stream, item)
+
+
+class ProgressBoard:
+    """
+    Aggregate byte counters of a run and their periodic output.
+    Bytes are counted by TransferProgress of every post-request,
+    the board only sums them up when it renders, so the send loop
+    isn't slowed down.
+    On a terminal the status line is refreshed in place every second,
+    otherwise a plain line is printed every interval_sec.
+    """
+
+    WINDOW_SEC = 30  # throughput is averaged over it
+
+    def __init__(self, interval_sec: int = 60):
+        self.__interval = interval_sec
+        self.total = 0  # bytes of queued files
+        self.done = 0  # bytes of uploaded files, once per file
+        # keys are (uploader, file): a file may go to several sites
+        self.__sizes = {}  # size of files w/o a final result
+        self.__posted = {}  # bytes of a post awaiting the file result
+        self.__sent = 0  # bytes sent by all finished post-requests
+        self.__active = {}  # TransferProgress of a running post
+        self.__samples = deque()
+
+    def add(self, key: tuple, size: int) -> None:
+        self.__sizes[key] = size
+        self.total += size
+
+    def start(self, key: tuple, progress) -> None:
+        self.__posted.pop(key, None)  # a re-upload replaces the last post
+        self.__active[key] = progress
+
+    def finish(self, key: tuple, uploaded: bool) -> None:
+        progress = self.__active.pop(key, None)
+        if progress is None:
+            return
+        self.__sent += progress.sent
+        if uploaded:
+            self.__posted[key] = progress.sent
+
+    def settle(self, key: tuple, sent: bool) -> None:
+        """
+        Final result of a file: its size goes to done if the file
+        was sent in this run, a resumed or failed file is dropped
+        from total, so the run ends at 100%.
+        """
+        size = self.__sizes.pop(key, 0)
+        self.__posted.pop(key, None)
+        if sent:
+            self.done += size
+        else:
+            self.total -= size
+
+    def line(self) -> str:
+        now = time.monotonic()
+        in_flight = sum(progress.sent for progress in self.__active.values())
+        sent_total = self.__sent + in_flight
+        self.__samples.append((now, sent_total))
+        while now - self.__samples[0][0] > self.WINDOW_SEC:
+            self.__samples.popleft()
+        first_time, first_sent = self.__samples[0]
+        speed = (sent_total - first_sent) / (now - first_time) \
+            if now > first_time else 0
+        uploaded = min(self.done + sum(self.__posted.values()) + in_flight,
+                       self.total)
+        left = self.total - uploaded
+        eta = verbose_duration(left / speed) if speed else '--:--:--'
+        active = ', '.join('{} {:.0f}%'.format(
+            progress.name, 100 * progress.sent / (progress.size or 1))
+            for progress in self.__active.values())
+        return '[{:.0f}% {}/{} | {}/s | ETA {} | {} active: {}]'.format(
+            100 * uploaded / (self.total or 1), verbose_bytes(uploaded),
+            verbose_bytes(self.total), verbose_bytes(speed), eta,
+            len(self.__active), active)
+
+    async def run(self) -> None:
+        """Render until cancelled"""
+        if not self.__interval:
+            return
+        stream = _StatusStream(sys.stdout) if sys.stdout.isatty() else None
+        if stream:
+            sys.stdout = stream
+        try:
+            while True:
+                await asyncio.sleep(1 if stream else self.__interval)
+                if stream:
+                    stream.draw(self.line())
+                elif self.__active:
+                    print(self.line())
+        finally:
+            if stream:
+                stream.clear()
+                sys.stdout = stream.stream
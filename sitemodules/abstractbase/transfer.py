@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import io
+import time
+from collections import deque
+
+
+class TransferProgress:
+    """
+    Byte counters of a single post-request.
+    feed is called from the send loop for every chunk read from the file,
+    so it does nothing but two assignments. Everything else (sliding
+    window, stall checks) is computed by the watchdog once a second.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self.sent = 0
+        self.started = self.last_activity = time.monotonic()
+        self.__samples = deque()
+
+    def feed(self, count: int) -> None:
+        self.sent += count
+        self.last_activity = time.monotonic()
+
+    def touch(self) -> None:
+        """Mark activity that isn't a sent byte (e.g. response headers)"""
+        self.last_activity = time.monotonic()
+
+    @property
+    def body_sent(self) -> bool:
+        return self.sent >= self.size
+
+    def stall_reason(self, idle_sec: float, min_speed: float,
+                     window_sec: float, response_idle_sec: float):
+        """
+        Check the transfer for a stall. Zero value of a threshold
+        disables the check.
+
+        :param idle_sec: max seconds w/o a sent byte while sending the body
+        :param min_speed: min bytes per second over the window_sec
+        :param window_sec: length of the sliding window in seconds
+        :param response_idle_sec: max seconds to wait for a response
+        after the body has been sent
+        :return: str with reason if the transfer stalled else None
+        """
+        now = time.monotonic()
+        idle = now - self.last_activity
+        if self.body_sent:
+            if response_idle_sec and idle > response_idle_sec:
+                return 'No response for {:.0f} sec'.format(idle)
+            return None
+        if idle_sec and idle > idle_sec:
+            return 'No bytes sent for {:.0f} sec ({}/{} B)'.format(
+                idle, self.sent, self.size)
+        if not min_speed or not window_sec:
+            return None
+        samples = self.__samples
+        samples.append((now, self.sent))
+        while len(samples) > 1 and now - samples[1][0] >= window_sec:
+            samples.popleft()
+        first_time, first_sent = samples[0]
+        if now - first_time < window_sec:
+            return None
+        speed = (self.sent - first_sent) / (now - first_time)
+        if speed < min_speed:
+            return 'Speed {:.0f} B/s < {:.0f} B/s for {:.0f} sec'.format(
+                speed, min_speed, now - first_time)
+        return None
+
+
+class ProgressReader(io.BufferedReader):
+    """
+    Buffered file reader that feeds TransferProgress.
+    It's still an io.BufferedReader so aiohttp sends it with
+    a Content-Length as a regular file.
+    """
+
+    def __init__(self, file_name: str, progress: TransferProgress):
+        super().__init__(io.FileIO(file_name, 'rb'))
+        self.progress = progress
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.progress.feed(len(chunk))
+        return chunk
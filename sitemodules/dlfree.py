@@ -3,6 +3,7 @@
 from .abstractbase.abstract_module import Uploader, UploaderException
 
 import aiohttp
+import asyncio
 import re
 import time
 
@@ -42,6 +43,20 @@ class DlFreeModule(Uploader):
                 print('{} for {}'.format(str(e), verbose_name))
                 return verbose_name, None
 
+        self._awaiting_link(file_with_path, dl_link)
+        link = await self.__poll_link(verbose_name, upload_name, dl_link,
+                                      counter)
+        if not link:
+            self._counter -= 1
+        return verbose_name, link
+
+    async def _resume_logic(self, file_with_path, upload_name, poll_url,
+                            counter):
+        verbose_name = self._verbose_name(file_with_path)
+        return verbose_name, await self.__poll_link(
+            verbose_name, upload_name, poll_url, counter)
+
+    async def __poll_link(self, verbose_name, upload_name, dl_link, counter):
         start_time = time.time()
         print('Waiting download link for {}'.format(verbose_name))
         while time.time() - start_time <= 30 * 60:
@@ -57,13 +72,12 @@ class DlFreeModule(Uploader):
                 current_dl_link = current_dl_link[0]
                 print('Got link for {} as {}: {} [{}/{}]'.format(
                     verbose_name, upload_name, current_dl_link, *counter))
-                return verbose_name, current_dl_link
+                return current_dl_link
             else:
-                time.sleep(5)
+                await asyncio.sleep(5)
         if time.time() - start_time > 30 * 60:
             print('Uploaded but getting time out for {}'.format(verbose_name))
-        self._counter -= 1
-        return verbose_name, None
+        return None
 
     @property
     def url(self):
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Registry of upload site modules.
+A module is imported only when its site is chosen, so the command line
+is parsed w/o importing aiohttp & Co.
+Third-party modules are registered as entry points of ENTRY_POINT_GROUP:
+    entry_points={'toruploader.sitemodules':
+                  ['bilderupload = bilderupload:BilderUpload']}
+"""
+
+from importlib import import_module
+
+ENTRY_POINT_GROUP = 'toruploader.sitemodules'
+
+# site: (module, class, url) url is only for the help,
+# benchmarks/startup.py checks it against the url of the module
+BUILTIN_MODULES = dict(
+    dlfree=('sitemodules.dlfree', 'DlFreeModule', 'http://dl.free.fr/'),
+    anonfile=('sitemodules.anonfamily', 'AnonFile', 'https://anonfile.com/'),
+    bayfile=('sitemodules.anonfamily', 'BayFile', 'https://bayfiles.com/'),
+    letsupload=('sitemodules.anonfamily', 'LetsUpload',
+                'https://letsupload.cc/'),
+    minfil=('sitemodules.anonfamily', 'MinFil', 'https://minfil.com/'),
+    myfile=('sitemodules.anonfamily', 'MyFile', 'https://myfile.is/')
+)
+
+_entry_points = None
+
+
+def _get_entry_points():
+    global _entry_points
+    if _entry_points is not None:
+        return _entry_points
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # python < 3.8, third-party modules are off
+        _entry_points = {}
+        return _entry_points
+    points = entry_points()
+    points = points.select(group=ENTRY_POINT_GROUP) \
+        if hasattr(points, 'select') else points.get(ENTRY_POINT_GROUP, [])
+    _entry_points = dict((point.name, point) for point in points
+                         if point.name not in BUILTIN_MODULES)
+    return _entry_points
+
+
+def available() -> dict:
+    """
+    :return: dict site: url (for third-party modules - entry point value)
+    w/o importing the modules
+    """
+    sites = dict((site, url) for site, (_, _, url)
+                 in BUILTIN_MODULES.items())
+    for site, point in _get_entry_points().items():
+        sites[site] = point.value
+    return sites
+
+
+def load(site: str) -> type:
+    """
+    Import a module of the site.
+
+    :param site: site name from available()
+    :return: Uploader subclass
+    """
+    if site in BUILTIN_MODULES:
+        module, cls, _ = BUILTIN_MODULES[site]
+        return getattr(import_module(module), cls)
+    try:
+        return _get_entry_points()[site].load()
+    except KeyError:
+        raise KeyError('Unknown upload site {}'.format(site))
@@ -2,31 +2,22 @@
 # -*- coding: utf-8 -*-
 
 import argparse
-from sitemodules.dlfree import DlFreeModule
-from sitemodules.anonfamily import AnonFile, BayFile,\
-    LetsUpload, MinFil, MyFile
+import shlex
+from sitemodules import registry
 
-file_sharing_service_dict = dict(
-    dlfree=DlFreeModule(),
-    anonfile=AnonFile(),
-    bayfile=BayFile(),
-    letsupload=LetsUpload(),
-    minfil=MinFil(),
-    myfile=MyFile()
-)
-
-
-def arg_parser():
-    parser = argparse.ArgumentParser()
 
+def add_job_arguments(parser, site_required=True):
+    sites = registry.available()
     module = 'Upload sites: '
-    for key, value in file_sharing_service_dict.items():
-        module += '({}: {}) '.format(key, value.url)
-    parser.add_argument('site', choices=file_sharing_service_dict.keys(),
-                        help=module)
+    for key, value in sites.items():
+        module += '({}: {}) '.format(key, value)
+    parser.add_argument('site', choices=sites.keys(),
+                        help=module, nargs=None if site_required else '?')
 
-    path = 'Folder with files from which you want to upload files'
-    parser.add_argument('path', help=path)
+    path = """Folder with files from which you want to upload files.
+        Several folders are uploaded as one queue in one session."""
+    parser.add_argument('path', help=path,
+                        nargs=None if site_required else '*')
 
     result_filename = """Filename with result 
     (default ~/TUpl/%%upload_folder_name%%_%%root_domain%%.txt) 
@@ -81,24 +72,6 @@ def arg_parser():
     parser.add_argument('-n', '--number', type=int, help=number_of_letters,
                         default=12)
 
-    tor_port = """An integer variable Tor service port 
-        (ports vary from 0 to 2**16-1). If the port
-        value is out of range, it's interpreted as loading without a Tor
-        To upload a file without a Tor, you can specify tor_port
-        as -1 (or less) or 2**16 (or greater).
-        (default 9050)"""
-    parser.add_argument('-p', '--port', type=int, help=tor_port, default=9050)
-
-    limit = """An integer variable 
-    maximum number of asynchronous post-requests.
-    (default 3)"""
-    parser.add_argument('-l', '--limit', type=int, help=limit, default=3)
-
-    time_out = """An integer variable time for upload a file.
-        (default 60*60*2 = 7200 -> 2 hours)"""
-    parser.add_argument('-t', '--timeout', type=int, help=time_out,
-                        default=7200)
-
     sort = r"""Key for NO sort. Sort uploads in alphabet order.
         Inserts a sorted list at the end of the result file
         for current module. If there are lines in the file that are
@@ -122,24 +95,225 @@ def arg_parser():
     parser.add_argument('-nw', '--nwrite', action='store_true',
                         help=ingnore_write)
 
-    args = parser.parse_args()
-    main_dict = dict(
-        files_path=args.path,
+    priority = """An integer variable priority of the folder.
+        Files of folders with a higher priority are taken by free
+        upload workers first, so urgent folders jump ahead in a batch.
+        (default 0)"""
+    parser.add_argument('-pr', '--priority', type=int, help=priority,
+                        default=0)
+
+
+def job_kwargs(args):
+    return dict(
         result_filename=args.result,
         filter_extensions=args.filter,
         need_to_exclude_uploaded=bool(args.nexclude ^ 1),
         number_of_letters_in_the_randomise_name=args.number,
+        sort_alphabetically=bool(args.nsort ^ 1),
+        open_folder_with_result=args.open,
+        write_the_results_to_a_file=bool(args.nwrite ^ 1),
+        priority=args.priority
+    )
+
+
+def read_job_file(filename, defaults):
+    """
+    Every line of the job file is %site% %path% [folder keys]
+    like in the command line, empty lines and lines starting with #
+    are skipped. Keys missing in a line are taken from the command line.
+    """
+    parser = argparse.ArgumentParser(prog='job line')
+    add_job_arguments(parser)
+    jobs = []
+    with open(filename) as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            args = parser.parse_args(shlex.split(line),
+                                     argparse.Namespace(**vars(defaults)))
+            jobs.append((args.site, args.path, job_kwargs(args)))
+    return jobs
+
+
+def arg_parser():
+    parser = argparse.ArgumentParser()
+    add_job_arguments(parser, site_required=False)
+
+    jobs = """Job file, every line is %%site%% %%path%% [folder keys]
+        (-r, -f, -ne, -n, -ns, -o, -nw, -pr), lines starting with #
+        are skipped. Folder keys missing in a line are taken from
+        the command line. Jobs are uploaded with site and path from
+        the command line as one queue in one session."""
+    parser.add_argument('-j', '--jobs', help=jobs, default=None)
+
+    tor_port = """An integer variable Tor service port 
+        (ports vary from 0 to 2**16-1). If the port
+        value is out of range, it's interpreted as loading without a Tor
+        To upload a file without a Tor, you can specify tor_port
+        as -1 (or less) or 2**16 (or greater).
+        (default 9050)"""
+    parser.add_argument('-p', '--port', type=int, help=tor_port, default=9050)
+
+    limit = """An integer variable 
+    maximum number of files uploaded at once, polling of links
+    and verification don't take these slots.
+    (default 3)"""
+    parser.add_argument('-l', '--limit', type=int, help=limit, default=3)
+
+    time_out = """An integer variable time for upload a file.
+        (default 60*60*2 = 7200 -> 2 hours)"""
+    parser.add_argument('-t', '--timeout', type=int, help=time_out,
+                        default=7200)
+
+    stall_idle = """An integer variable seconds w/o a sent byte after which
+        the upload of a file is aborted as stalled and the file is put
+        back in the queue. 0 - disabled.
+        (default 120)"""
+    parser.add_argument('-si', '--stallidle', type=int, help=stall_idle,
+                        default=120)
+
+    min_speed = """A float variable min average upload speed in KB/s
+        over the stall window. A slower upload is aborted as stalled.
+        0 - disabled.
+        (default 1)"""
+    parser.add_argument('-ms', '--minspeed', type=float, help=min_speed,
+                        default=1)
+
+    stall_window = """An integer variable sliding window in seconds
+        for the min speed check.
+        (default 300)"""
+    parser.add_argument('-sw', '--stallwindow', type=int, help=stall_window,
+                        default=300)
+
+    response_idle = """An integer variable seconds to wait for a response
+        after the whole file was sent. 0 - disabled.
+        (default 600)"""
+    parser.add_argument('-ri', '--responseidle', type=int,
+                        help=response_idle, default=600)
+
+    retries = """An integer variable how many times a stalled or
+        corrupted (see verify) file is put back in the queue.
+        (default 2)"""
+    parser.add_argument('-rt', '--retries', type=int, help=retries,
+                        default=2)
+
+    verify = """An integer variable count of byte ranges (64 KB)
+        to download after the upload and compare with the local file.
+        The first and the last ranges are always checked (so 1 is 2).
+        If the ranges or the size differs the file is uploaded again,
+        after the last retry the link is written as
+        %%upload_name%%:MISMATCH %%download_link%% and the file isn't
+        excluded from the next upload.
+        Works for anonfiles family only. 0 - disabled.
+        (default 0)"""
+    parser.add_argument('-v', '--verify', type=int, help=verify, default=0)
+
+    verify_full = """A float variable files up to this size (MB) are
+        downloaded fully for verification.
+        (default 1)"""
+    parser.add_argument('-vf', '--verifyfull', type=float, help=verify_full,
+                        default=1)
+
+    verify_limit = """An integer variable maximum number of asynchronous
+        verifications, they don't take upload slots.
+        (default 2)"""
+    parser.add_argument('-vl', '--verifylimit', type=int, help=verify_limit,
+                        default=2)
+
+    verify_timeout = """An integer variable timeout in seconds of a range
+        request for verification, a file whose range timed out
+        is considered as verified.
+        (default 60)"""
+    parser.add_argument('-vt', '--verifytimeout', type=int,
+                        help=verify_timeout, default=60)
+
+    keepalive = """An integer variable seconds to keep an idle connection
+        in the pool for reuse. Over Tor each new connection costs
+        seconds of handshakes.
+        (default 300)"""
+    parser.add_argument('-ka', '--keepalive', type=int, help=keepalive,
+                        default=300)
+
+    prewarm = """Key for NO prewarm. Open a connection for the next
+        upload to the same site while the current one waits
+        for the response.
+        (w/o key - prewarm)"""
+    parser.add_argument('-npw', '--nprewarm', action='store_true',
+                        help=prewarm)
+
+    progress = """An integer variable seconds between progress lines
+        (uploaded bytes, speed, ETA, active files) when the output isn't
+        a terminal, on a terminal the status line is refreshed in place
+        every second. 0 - disabled.
+        (default 60)"""
+    parser.add_argument('-pg', '--progress', type=int, help=progress,
+                        default=60)
+
+    plan = """Key for plan. Scan the folders, filter and exclude files
+        like an upload does, but don't upload. Prints count and size
+        of files to upload, skipped files and estimated time per site
+        from throughput measured in previous runs (~/TUpl/history.json)
+        (w/o key - upload)"""
+    parser.add_argument('-pl', '--plan', action='store_true', help=plan)
+
+    args = parser.parse_args()
+    jobs = [(args.site, path, job_kwargs(args)) for path in args.path] \
+        if args.site else []
+    if args.jobs:
+        jobs += read_job_file(args.jobs, args)
+    if not jobs:
+        parser.error('site and path or a job file are required')
+    context_dict = dict(
         tor_port=args.port,
         upload_limit=args.limit,
         post_req_time_out_sec=args.timeout,
-        sort_alphabetically=bool(args.nsort ^ 1),
-        open_folder_with_result=args.open,
-        write_the_results_to_a_file=bool(args.nwrite ^ 1)
+        stall_idle_sec=args.stallidle,
+        stall_min_speed_kbs=args.minspeed,
+        stall_window_sec=args.stallwindow,
+        response_idle_sec=args.responseidle,
+        upload_retries=args.retries,
+        verify_samples=args.verify,
+        verify_full_size_mb=args.verifyfull,
+        verify_limit=args.verifylimit,
+        verify_timeout_sec=args.verifytimeout,
+        keepalive_sec=args.keepalive,
+        prewarm_connections=bool(args.nprewarm ^ 1),
+        progress_interval_sec=args.progress
     )
-    return args.site, main_dict
+    return context_dict, jobs, args.plan
+
+
+def prepare_jobs(jobs, prepare):
+    """
+    Call prepare(uploader, path, kwargs) for every job,
+    a job with a missing folder or bad keys is reported and skipped
+    so the rest of the batch is uploaded.
+    """
+    from sitemodules.abstractbase.abstract_module import UploaderException
+    prepared = []
+    for site, path, kwargs in jobs:
+        try:
+            prepared.append(prepare(registry.load(site)(), path, kwargs))
+        except UploaderException as e:
+            print('Skipping job {} {}: {}'.format(site, path, str(e)))
+    return prepared
 
 
 if __name__ == '__main__':
-    uploader_name, kwargs = arg_parser()
-    Uploader = file_sharing_service_dict[uploader_name]
-    Uploader(**kwargs)
+    context_kwargs, jobs, plan_only = arg_parser()
+    # networking imports only after the arguments were parsed
+    if plan_only:
+        from sitemodules.abstractbase.planner import print_plan
+        plans = prepare_jobs(jobs, lambda uploader, path, kwargs:
+                             uploader.plan(
+                                 path, kwargs['result_filename'],
+                                 kwargs['filter_extensions'],
+                                 kwargs['need_to_exclude_uploaded']))
+        print_plan(plans, context_kwargs['upload_limit'])
+    else:
+        from sitemodules.abstractbase.context import UploadContext
+        context = UploadContext(**context_kwargs)
+        uploaders = prepare_jobs(jobs, lambda uploader, path, kwargs:
+                                 uploader.prepare(context, path, **kwargs))
+        context.run(uploaders)